@@ -3,9 +3,8 @@ Chat API Models
 Pydantic models for chat endpoints request/response validation.
 """
 
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Literal
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, List, Optional, Literal
 
 
 class ChatMessage(BaseModel):
@@ -14,38 +13,34 @@ class ChatMessage(BaseModel):
     content: str = Field(..., min_length=1, max_length=10000)
     timestamp: Optional[int] = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "role": "user",
                 "content": "哪個時段最繁忙？",
                 "timestamp": 1734480123456
             }
         }
+    )
 
 
 class DataContext(BaseModel):
     """Current heatmap filter context."""
-    month: int = Field(..., description="YYYYMM format (e.g., 202412)")
+    month: Annotated[int, Field(ge=100000, le=999912, description="YYYYMM format (e.g., 202412)")]
     hour: int = Field(..., ge=0, le=23, description="Hour of day (0-23)")
     day_type: Literal["平日", "假日"] = Field(..., description="Day type: weekday or weekend")
 
-    @field_validator('month')
-    @classmethod
-    def validate_month(cls, v):
-        """Validate month format."""
-        if not (100000 <= v <= 999912):
-            raise ValueError("Month must be in YYYYMM format (e.g., 202412)")
-        return v
-
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "month": 202412,
                 "hour": 8,
                 "day_type": "平日"
             }
         }
+    )
 
 
 class ChatRequest(BaseModel):
@@ -54,8 +49,9 @@ class ChatRequest(BaseModel):
     context: DataContext = Field(..., description="Current heatmap filter conditions")
     history: List[ChatMessage] = Field(default_factory=list, max_length=20, description="Recent conversation history")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "message": "哪個時段最繁忙？",
                 "context": {
@@ -66,6 +62,7 @@ class ChatRequest(BaseModel):
                 "history": []
             }
         }
+    )
 
 
 class ChatResponse(BaseModel):
@@ -75,8 +72,9 @@ class ChatResponse(BaseModel):
     model: str = Field(..., description="Model used (e.g., qwen2.5:7b)")
     tokens_used: int = Field(default=0, description="Approximate token count")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "response": "根據12月平日早上8點的數據，此時段總使用者數為5234.5人...",
                 "timestamp": 1734480123456,
@@ -84,6 +82,7 @@ class ChatResponse(BaseModel):
                 "tokens_used": 245
             }
         }
+    )
 
 
 class HealthResponse(BaseModel):
@@ -96,8 +95,9 @@ class HealthResponse(BaseModel):
     error: Optional[str] = Field(None, description="Error message if any")
     timestamp: str = Field(..., description="ISO 8601 timestamp of health check")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "status": "ok",
                 "ollama_status": "connected",
@@ -108,6 +108,7 @@ class HealthResponse(BaseModel):
                 "timestamp": "2025-12-17T10:30:00Z"
             }
         }
+    )
 
 
 class ContextResponse(BaseModel):
@@ -116,8 +117,9 @@ class ContextResponse(BaseModel):
     sample_data: List[dict] = Field(..., description="Sample data records (max 50)")
     note: Optional[str] = Field(None, description="Informational message")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "metadata": {
                     "total_records": 124,
@@ -127,3 +129,4 @@ class ContextResponse(BaseModel):
                 "note": "Showing 50 of 124 records"
             }
         }
+    )
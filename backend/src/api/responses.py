@@ -0,0 +1,52 @@
+"""
+API Response Classes
+orjson-backed response class with a fallback for numpy scalar types.
+"""
+
+from typing import Any
+
+import numpy as np
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def orjson_default(value: Any) -> Any:
+    """
+    Convert values orjson cannot serialize natively.
+
+    Args:
+        value: Object rejected by orjson's built-in encoders
+
+    Returns:
+        Native Python equivalent of numpy scalars
+
+    Raises:
+        TypeError: If the value has no JSON representation
+    """
+    if isinstance(value, (np.floating, np.integer, np.bool_)):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Serialize content to JSON bytes with numpy support.
+
+    Args:
+        content: JSON-compatible object, possibly containing numpy values
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    return orjson.dumps(
+        content,
+        default=orjson_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that serializes numpy scalars via orjson_default."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
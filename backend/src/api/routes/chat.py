@@ -3,28 +3,97 @@ Chat API Routes
 Endpoints for AI-powered chatbot conversation about heatmap data.
 """
 
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException, status
+import time
+from functools import lru_cache
+import orjson
+from fastapi import APIRouter, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-from typing import Dict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import TypeAdapter
 
 from ..models.chat import (
+    ChatMessage,
     ChatRequest,
     ChatResponse,
     HealthResponse,
     ContextResponse
 )
-from ...services.ollama_service import get_ollama_service
+from ..responses import NumpyORJSONResponse, dumps_json
+from ...services.ollama_service import OllamaService, get_ollama_service
 from ...services.data_exporter import get_data_exporter
-from ...utils.config import OLLAMA_MODEL
+from ...utils.config import OLLAMA_HEALTH_TTL, OLLAMA_MODEL
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Serializer for conversation history passed to Ollama
+_HISTORY_ADAPTER = TypeAdapter(List[ChatMessage])
 
-@router.post("/chat/message", response_model=ChatResponse, status_code=status.HTTP_200_OK)
-async def send_message(request: ChatRequest) -> ChatResponse:
+# Latest serialized /chat/health payload and its time.monotonic() check time, kept current by refresh_health_loop
+_health_payload: Optional[bytes] = None
+_health_checked_at: float = 0.0
+
+# A stored health payload older than this many refresh intervals is re-checked inline
+HEALTH_STALE_INTERVALS = 3
+
+
+async def _prepare_chat(request: ChatRequest) -> Tuple[OllamaService, Dict, List[Dict]]:
+    """
+    Check Ollama availability and build the data context and history for a chat request.
+
+    Args:
+        request: ChatRequest with message, context, and history
+
+    Returns:
+        Tuple of (ollama_service, data_context, history)
+
+    Raises:
+        HTTPException: 503 if Ollama service is unavailable
+    """
+    # Get services
+    ollama_service = get_ollama_service()
+    data_exporter = get_data_exporter()
+
+    # Check Ollama health first
+    health = await ollama_service.check_health()
+    if health['status'] != 'connected':
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Ollama service is not available. {health.get('error', '')}"
+        )
+
+    # Build data context for AI
+    month = request.context.month
+    hour = request.context.hour
+    day_type = request.context.day_type
+
+    # Get data summary (ONLY backend-calculated stats, no raw data)
+    summary = data_exporter.get_context_summary(month, hour, day_type)
+
+    # Build complete context - LLM only receives backend-calculated results
+    data_context = {
+        'month': month,
+        'hour': hour,
+        'day_type': day_type,
+        'summary': summary
+    }
+
+    # Prepare conversation history (serialized by pydantic-core, without timestamps)
+    history = _HISTORY_ADAPTER.dump_python(request.history, exclude={'__all__': {'timestamp'}})
+
+    return ollama_service, data_context, history
+
+
+@router.post(
+    "/chat/message",
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": ChatResponse}}
+)
+async def send_message(request: ChatRequest) -> NumpyORJSONResponse:
     """
     Send user message and receive AI-generated response.
 
@@ -35,7 +104,7 @@ async def send_message(request: ChatRequest) -> ChatResponse:
         request: ChatRequest with message, context, and history
 
     Returns:
-        ChatResponse with AI answer, timestamp, model info
+        ChatResponse-shaped JSON with AI answer, timestamp, model info
 
     Raises:
         400: Invalid request parameters
@@ -43,55 +112,23 @@ async def send_message(request: ChatRequest) -> ChatResponse:
         500: AI inference failed
     """
     try:
-        # Get services
-        ollama_service = get_ollama_service()
-        data_exporter = get_data_exporter()
-
-        # Check Ollama health first
-        health = ollama_service.check_health()
-        if health['status'] != 'connected':
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Ollama service is not available. {health.get('error', '')}"
-            )
-
-        # Build data context for AI
-        month = request.context.month
-        hour = request.context.hour
-        day_type = request.context.day_type
-
-        # Get data summary (ONLY backend-calculated stats, no raw data)
-        summary = data_exporter.get_context_summary(month, hour, day_type)
-
-        # Build complete context - LLM only receives backend-calculated results
-        data_context = {
-            'month': month,
-            'hour': hour,
-            'day_type': day_type,
-            'summary': summary
-        }
-
-        # Prepare conversation history
-        history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in request.history
-        ]
+        ollama_service, data_context, history = await _prepare_chat(request)
 
         # Generate AI response
         logger.info(f"Processing message: {request.message[:50]}...")
-        result = ollama_service.generate_response(
+        result = await ollama_service.generate_response(
             user_message=request.message,
             data_context=data_context,
             history=history
         )
 
-        # Build response
-        return ChatResponse(
-            response=result['response'],
-            timestamp=int(datetime.now().timestamp() * 1000),
-            model=result['model'],
-            tokens_used=result.get('tokens_used', 0)
-        )
+        # Build response (returned directly to skip response_model validation)
+        return NumpyORJSONResponse({
+            'response': result['response'],
+            'timestamp': int(datetime.now().timestamp() * 1000),
+            'model': result['model'],
+            'tokens_used': result.get('tokens_used', 0)
+        })
 
     except HTTPException:
         raise
@@ -103,17 +140,77 @@ async def send_message(request: ChatRequest) -> ChatResponse:
         )
 
 
-@router.get("/chat/health", response_model=HealthResponse, status_code=status.HTTP_200_OK)
-async def check_health() -> HealthResponse:
+@router.post("/chat/stream", status_code=status.HTTP_200_OK)
+async def stream_message(request: ChatRequest) -> StreamingResponse:
     """
-    Check Ollama service availability and model status.
+    Send user message and stream the AI-generated response.
+
+    Same input as /chat/message. The body is newline-delimited JSON: one
+    {"delta": str} line per generated chunk, then a final line with
+    {"done": true, "model": str, "tokens_used": int, "timestamp": int}.
+    If inference fails after streaming has started, the last line is
+    {"error": str} instead.
+
+    Args:
+        request: ChatRequest with message, context, and history
 
     Returns:
-        HealthResponse with connection status and error details if any
+        StreamingResponse with application/x-ndjson content
+
+    Raises:
+        503: Ollama service unavailable
+        500: Failed to prepare the request
     """
+    try:
+        ollama_service, data_context, history = await _prepare_chat(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing message: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate response: {str(e)}"
+        )
+
+    async def ndjson_chunks() -> AsyncIterator[bytes]:
+        logger.info(f"Streaming message: {request.message[:50]}...")
+        try:
+            async for chunk in ollama_service.stream_response(
+                user_message=request.message,
+                data_context=data_context,
+                history=history
+            ):
+                if chunk.get('done'):
+                    chunk = {**chunk, 'timestamp': int(datetime.now().timestamp() * 1000)}
+                yield orjson.dumps(chunk) + b"\n"
+        except Exception as e:
+            logger.error(f"Error streaming message: {e}", exc_info=True)
+            yield orjson.dumps({'error': str(e)}) + b"\n"
+
+    return StreamingResponse(ndjson_chunks(), media_type="application/x-ndjson")
+
+
+async def refresh_health_payload(timeout: float = OLLAMA_HEALTH_TTL) -> bytes:
+    """
+    Run a fresh Ollama health check and store the serialized /chat/health payload.
+
+    A check that does not finish within timeout seconds is recorded as an error,
+    so a hung Ollama connection cannot leave a stale "ok" payload in place.
+
+    Args:
+        timeout: Maximum seconds to wait for Ollama
+
+    Returns:
+        HealthResponse-shaped JSON bytes
+    """
+    global _health_payload, _health_checked_at
+
     try:
         ollama_service = get_ollama_service()
-        health = ollama_service.check_health()
+        try:
+            health = await asyncio.wait_for(ollama_service.check_health(max_age=0), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Ollama health check timed out after {timeout:g}s")
 
         # Determine overall status
         overall_status = "ok" if health['status'] == 'connected' else "degraded"
@@ -121,31 +218,126 @@ async def check_health() -> HealthResponse:
         # GPU available if model is loaded
         gpu_available = health['model_loaded']
 
-        return HealthResponse(
-            status=overall_status,
-            ollama_status=health['status'],
-            model=OLLAMA_MODEL,
-            model_loaded=health['model_loaded'],
-            gpu_available=gpu_available if health['model_loaded'] else None,
-            error=health.get('error'),
-            timestamp=datetime.utcnow().isoformat() + "Z"
-        )
+        payload = {
+            'status': overall_status,
+            'ollama_status': health['status'],
+            'model': OLLAMA_MODEL,
+            'model_loaded': health['model_loaded'],
+            'gpu_available': gpu_available if health['model_loaded'] else None,
+            'error': health.get('error'),
+            'timestamp': datetime.utcnow().isoformat() + "Z"
+        }
 
     except Exception as e:
         logger.error(f"Health check failed: {e}")
-        return HealthResponse(
-            status="degraded",
-            ollama_status="error",
-            model=OLLAMA_MODEL,
-            model_loaded=False,
-            gpu_available=None,
-            error=str(e),
-            timestamp=datetime.utcnow().isoformat() + "Z"
+        payload = {
+            'status': "degraded",
+            'ollama_status': "error",
+            'model': OLLAMA_MODEL,
+            'model_loaded': False,
+            'gpu_available': None,
+            'error': str(e),
+            'timestamp': datetime.utcnow().isoformat() + "Z"
+        }
+
+    _health_payload = dumps_json(payload)
+    _health_checked_at = time.monotonic()
+    return _health_payload
+
+
+async def refresh_health_loop(interval: float = OLLAMA_HEALTH_TTL):
+    """
+    Refresh the /chat/health payload every interval seconds until cancelled.
+
+    Args:
+        interval: Seconds between health checks
+    """
+    while True:
+        await refresh_health_payload(timeout=interval)
+        await asyncio.sleep(interval)
+
+
+@router.get(
+    "/chat/health",
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": HealthResponse}}
+)
+async def check_health() -> Response:
+    """
+    Check Ollama service availability and model status.
+
+    Serves the payload kept current by refresh_health_loop; the timestamp
+    is the time of the last check. If no payload exists yet or it is older
+    than HEALTH_STALE_INTERVALS refresh intervals, a bounded check runs inline.
+
+    Returns:
+        HealthResponse-shaped JSON with connection status and error details if any
+    """
+    payload = _health_payload
+    age = time.monotonic() - _health_checked_at
+    if payload is None or age > HEALTH_STALE_INTERVALS * OLLAMA_HEALTH_TTL:
+        # Background refresh not started yet or no longer running
+        payload = await refresh_health_payload()
+
+    return Response(content=payload, media_type="application/json")
+
+
+@lru_cache(maxsize=1024)
+def _build_context_payload(month: int, hour: int, day_type: str) -> bytes:
+    """
+    Build the serialized /chat/context payload for one filter combination.
+
+    The data cache is immutable per process, so the bytes are memoized per key.
+
+    Args:
+        month: Month in YYYYMM format
+        hour: Hour of day (0-23)
+        day_type: "平日" or "假日"
+
+    Returns:
+        ContextResponse-shaped JSON bytes
+    """
+    data_exporter = get_data_exporter()
+
+    # Single lookup shared by the record count and the sample export
+    filtered_df = data_exporter.get_filtered(month, hour, day_type)
+    total_records = 0 if filtered_df is None else len(filtered_df)
+
+    # Get sample data (first 50 records)
+    sample_records = []
+    if total_records > 0:
+        sample_records = data_exporter.export_to_json(
+            month, hour, day_type, filtered_df=filtered_df.head(50)
         )
 
+    # Build metadata
+    metadata = {
+        'total_records': total_records,
+        'query': {
+            'month': month,
+            'hour': hour,
+            'day_type': day_type
+        }
+    }
+
+    # Note if data was truncated
+    note = None
+    if total_records > 50:
+        note = f"Showing 50 of {total_records} records"
 
-@router.get("/chat/context", response_model=ContextResponse, status_code=status.HTTP_200_OK)
-async def get_context(month: int, hour: int, day_type: str) -> ContextResponse:
+    return dumps_json({
+        'metadata': metadata,
+        'sample_data': sample_records,
+        'note': note
+    })
+
+
+@router.get(
+    "/chat/context",
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": ContextResponse}}
+)
+async def get_context(month: int, hour: int, day_type: str) -> Response:
     """
     Get current data context for debugging/testing.
 
@@ -157,38 +349,13 @@ async def get_context(month: int, hour: int, day_type: str) -> ContextResponse:
         day_type: "平日" or "假日"
 
     Returns:
-        ContextResponse with metadata and sample data
+        ContextResponse-shaped JSON with metadata and sample data
     """
     try:
-        data_exporter = get_data_exporter()
-
-        # Get summary
-        summary = data_exporter.get_context_summary(month, hour, day_type)
-
-        # Get sample data (first 50 records)
-        data_records = data_exporter.export_to_json(month, hour, day_type)
-        total_records = len(data_records)
-        sample_records = data_records[:50]
-
-        # Build metadata
-        metadata = {
-            'total_records': summary['total_records'],
-            'query': {
-                'month': month,
-                'hour': hour,
-                'day_type': day_type
-            }
-        }
-
-        # Note if data was truncated
-        note = None
-        if total_records > 50:
-            note = f"Showing 50 of {total_records} records"
-
-        return ContextResponse(
-            metadata=metadata,
-            sample_data=sample_records,
-            note=note
+        # Return pre-serialized bytes to skip response_model validation and jsonable_encoder
+        return Response(
+            content=_build_context_payload(month, hour, day_type),
+            media_type="application/json"
         )
 
     except Exception as e:
@@ -3,7 +3,9 @@ FastAPI Application Entry Point
 Main application with CORS middleware and route registration.
 """
 
+import asyncio
 import logging
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -12,8 +14,10 @@ from pathlib import Path
 
 from .utils.config import API_CONFIG, CORS_CONFIG, get_data_path
 from .services.data_loader import initialize_cache
+from .services.data_exporter import get_data_exporter
 from .services.ollama_service import get_ollama_service
 from .api.routes import data, demographics, chat
+from .api.responses import NumpyORJSONResponse
 
 # Configure logging
 logging.basicConfig(
@@ -22,13 +26,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Background task refreshing the /api/chat/health payload
+_health_refresh_task: Optional[asyncio.Task] = None
+
 # Create FastAPI app
 app = FastAPI(
     title="Store Heatmap Visualization API",
     description="REST API for interactive geographic heatmap visualization of user distribution data",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=NumpyORJSONResponse
 )
 
 # Configure CORS
@@ -51,10 +59,13 @@ async def startup_event():
         initialize_cache(str(data_path))
         logger.info("Data cache initialized successfully")
 
+        # Precompute chat context summaries before serving requests
+        get_data_exporter()
+
         # Check Ollama service availability
         logger.info("Checking Ollama service availability...")
         ollama_service = get_ollama_service()
-        health = ollama_service.check_health()
+        health = await ollama_service.check_health()
 
         if health['status'] == 'connected':
             logger.info(f"Ollama service connected: {health['available_models']}")
@@ -62,12 +73,23 @@ async def startup_event():
             logger.warning(f"Ollama service not available: {health.get('error', 'Unknown error')}")
             logger.warning("Chat functionality will be limited until Ollama is started")
 
+        # Keep the chat health payload current in the background
+        global _health_refresh_task
+        _health_refresh_task = asyncio.create_task(chat.refresh_health_loop())
+
         logger.info("Application startup complete")
     except Exception as e:
         logger.error(f"Startup failed: {e}")
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks on application shutdown."""
+    if _health_refresh_task is not None:
+        _health_refresh_task.cancel()
+
+
 @app.get("/health")
 async def health_check():
     """
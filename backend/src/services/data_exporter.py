@@ -4,12 +4,58 @@ Exports heatmap data to JSON format with context summaries for AI analysis.
 """
 
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
 from .data_loader import get_cache
 
 logger = logging.getLogger(__name__)
 
+# Demographic percentage columns, weighted by avg_total_users in summaries
+DEMOGRAPHIC_COLS = [
+    'sex_1', 'sex_2',
+    'age_1', 'age_2', 'age_3', 'age_4', 'age_5', 'age_6', 'age_7', 'age_8', 'age_9', 'age_other'
+]
+
+# Stay duration columns, summed across locations in summaries
+DURATION_COLS = ['avg_users_under_10min', 'avg_users_10_30min', 'avg_users_over_30min']
+
+# Number of top locations included in summaries
+TOP_LOCATIONS_K = 5
+
+# Float columns in exported records, cast to float64 for native Python values
+EXPORT_FLOAT_COLS = ['lat', 'lng', 'avg_total_users'] + DURATION_COLS + DEMOGRAPHIC_COLS
+
+# Columns in exported records (23 fields from spec)
+EXPORT_COLS = [
+    'month', 'gx', 'gy', 'lat', 'lng', 'hour', 'day_type',
+    'avg_total_users', 'avg_users_under_10min', 'avg_users_10_30min', 'avg_users_over_30min',
+    'sex_1', 'sex_2',
+    'age_1', 'age_2', 'age_3', 'age_4', 'age_5', 'age_6', 'age_7', 'age_8', 'age_9', 'age_other'
+]
+
+# Shared results for filter combinations without data; records are an immutable tuple,
+# the summary stays a dict because orjson cannot serialize MappingProxyType (callers must not mutate it)
+EMPTY_RECORDS: Tuple[Dict, ...] = ()
+EMPTY_SUMMARY: Dict = {
+    'total_records': 0,
+    'total_users': 0.0,
+    'duration_distribution': {
+        'under_10min': 0.0,
+        'min_10_30': 0.0,
+        'over_30min': 0.0
+    },
+    'gender_distribution': {
+        'male_pct': 0.0,
+        'female_pct': 0.0
+    },
+    'age_distribution': {
+        'age_1': 0.0, 'age_2': 0.0, 'age_3': 0.0, 'age_4': 0.0, 'age_5': 0.0,
+        'age_6': 0.0, 'age_7': 0.0, 'age_8': 0.0, 'age_9': 0.0, 'age_other': 0.0
+    },
+    'top_locations': []
+}
+
 
 class DataExporter:
     """
@@ -19,16 +65,49 @@ class DataExporter:
     """
 
     def __init__(self):
-        """Initialize data exporter with access to data cache."""
+        """Initialize data exporter and precompute summaries and export frames for every cached time period."""
         self.cache = get_cache()
-        logger.info("DataExporter initialized")
 
-    def export_to_json(
+        # Export frames narrowed to EXPORT_COLS, so requests skip column selection and casting
+        self.projected_dict: Dict[Tuple[int, int, str], pd.DataFrame] = {
+            key: self._project(filtered_df)
+            for key, filtered_df in self.cache.lookup_dict.items()
+        }
+
+        # Summaries are deterministic per key, so build them once instead of per request
+        self.summary_dict: Dict[Tuple[int, int, str], Dict] = {
+            key: self._compute_summary(filtered_df)
+            for key, filtered_df in self.cache.lookup_dict.items()
+        }
+        logger.info(f"DataExporter initialized: {len(self.summary_dict)} summaries precomputed")
+
+    def get_filtered(
         self,
         month: int,
         hour: int,
         day_type: str
-    ) -> List[Dict]:
+    ) -> Optional[pd.DataFrame]:
+        """
+        Get the precomputed export frame for a time period.
+
+        Args:
+            month: Month identifier (YYYYMM format)
+            hour: Hour of day (0-23)
+            day_type: Day type ("平日" or "假日")
+
+        Returns:
+            DataFrame with EXPORT_COLS, or None if no data exists for the period
+        """
+        # O(1) lookup
+        return self.projected_dict.get((month, hour, day_type))
+
+    def export_to_json(
+        self,
+        month: int,
+        hour: int,
+        day_type: str,
+        filtered_df: Optional[pd.DataFrame] = None
+    ) -> Sequence[Dict]:
         """
         Export filtered data as list of dictionaries.
 
@@ -36,40 +115,39 @@ class DataExporter:
             month: Month identifier (YYYYMM format)
             hour: Hour of day (0-23)
             day_type: Day type ("平日" or "假日")
+            filtered_df: Frame already fetched via get_filtered (skips the lookup)
 
         Returns:
-            List of data records as dictionaries with 23 fields
+            Sequence of data records as dictionaries with 23 fields
+            (the shared empty tuple EMPTY_RECORDS when there is no data)
         """
-        # Get filtered data from cache (O(1) lookup)
-        filtered_df = self.cache.lookup_dict.get((month, hour, day_type))
+        if filtered_df is None:
+            filtered_df = self.get_filtered(month, hour, day_type)
 
         if filtered_df is None or filtered_df.empty:
-            return []
-
-        # Select required columns (23 fields from spec)
-        required_cols = [
-            'month', 'gx', 'gy', 'lat', 'lng', 'hour', 'day_type',
-            'avg_total_users', 'avg_users_under_10min', 'avg_users_10_30min', 'avg_users_over_30min',
-            'sex_1', 'sex_2',
-            'age_1', 'age_2', 'age_3', 'age_4', 'age_5', 'age_6', 'age_7', 'age_8', 'age_9', 'age_other'
-        ]
+            return EMPTY_RECORDS
+
+        # Convert to list of dicts
+        return filtered_df.to_dict('records')
 
+    def _project(self, filtered_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Narrow one filtered time period to the exported columns.
+
+        Args:
+            filtered_df: Cached rows for a single (month, hour, day_type) key
+
+        Returns:
+            DataFrame with EXPORT_COLS and float columns as float64
+        """
         # Note: 'lng' column might be 'lon' in some datasets, check and adapt
         if 'lng' not in filtered_df.columns and 'lon' in filtered_df.columns:
             filtered_df = filtered_df.rename(columns={'lon': 'lng'})
 
-        # Convert to list of dicts
-        data_records = filtered_df[required_cols].to_dict('records')
-
-        # Convert numpy types to Python native types for JSON serialization
-        for record in data_records:
-            for key, value in record.items():
-                if pd.isna(value):
-                    record[key] = 0.0 if isinstance(value, (int, float)) else None
-                elif hasattr(value, 'item'):  # numpy types
-                    record[key] = value.item()
-
-        return data_records
+        # Select required columns and cast floats once so to_dict emits native Python values
+        export_df = filtered_df[EXPORT_COLS].copy()
+        export_df[EXPORT_FLOAT_COLS] = export_df[EXPORT_FLOAT_COLS].astype('float64')
+        return export_df
 
     def get_context_summary(
         self,
@@ -96,76 +174,71 @@ class DataExporter:
             - Age distribution: age_1 to age_9, age_other
             - Top locations: top 5 locations by user count
         """
-        # Get filtered data
-        filtered_df = self.cache.lookup_dict.get((month, hour, day_type))
+        # Precomputed at initialization (O(1) lookup)
+        return self.summary_dict.get((month, hour, day_type), EMPTY_SUMMARY)
 
-        if filtered_df is None or filtered_df.empty:
-            return {
-                'total_records': 0,
-                'total_users': 0.0,
-                'duration_distribution': {
-                    'under_10min': 0.0,
-                    'min_10_30': 0.0,
-                    'over_30min': 0.0
-                },
-                'gender_distribution': {
-                    'male_pct': 0.0,
-                    'female_pct': 0.0
-                },
-                'age_distribution': {
-                    'age_1': 0.0, 'age_2': 0.0, 'age_3': 0.0, 'age_4': 0.0, 'age_5': 0.0,
-                    'age_6': 0.0, 'age_7': 0.0, 'age_8': 0.0, 'age_9': 0.0, 'age_other': 0.0
-                },
-                'top_locations': []
-            }
+    def _compute_summary(self, filtered_df: pd.DataFrame) -> Dict:
+        """
+        Compute summary statistics for one filtered time period.
+
+        Args:
+            filtered_df: Cached rows for a single (month, hour, day_type) key
+
+        Returns:
+            Summary dictionary in the format returned by get_context_summary
+        """
+        if filtered_df.empty:
+            return EMPTY_SUMMARY
 
         # Handle lng/lon column name
         lng_col = 'lng' if 'lng' in filtered_df.columns else 'lon'
 
         # Calculate summary statistics
         total_records = len(filtered_df)
-        total_users = float(filtered_df['avg_total_users'].sum())
+        weights = filtered_df['avg_total_users'].to_numpy(dtype=np.float64)
+        total_users = weights.sum()
 
         # Duration distribution (actual user counts, not percentages)
-        total_under_10min = float(filtered_df['avg_users_under_10min'].sum()) if 'avg_users_under_10min' in filtered_df.columns else 0.0
-        total_10_30min = float(filtered_df['avg_users_10_30min'].sum()) if 'avg_users_10_30min' in filtered_df.columns else 0.0
-        total_over_30min = float(filtered_df['avg_users_over_30min'].sum()) if 'avg_users_over_30min' in filtered_df.columns else 0.0
+        total_under_10min, total_10_30min, total_over_30min = (
+            filtered_df.reindex(columns=DURATION_COLS, fill_value=0.0).sum(axis=0).to_numpy(dtype=np.float64).tolist()
+        )
 
-        # Weighted average demographics (percentages)
-        weights = filtered_df['avg_total_users'].values
+        # Weighted average demographics (percentages) in a single matrix-vector product
         if total_users > 0:
-            avg_sex_1 = float((filtered_df['sex_1'] * weights).sum() / total_users)
-            avg_sex_2 = float((filtered_df['sex_2'] * weights).sum() / total_users)
+            demographics = filtered_df.reindex(columns=DEMOGRAPHIC_COLS, fill_value=0.0).to_numpy(dtype=np.float64)
+            weighted = ((weights @ demographics) / total_users).tolist()
         else:
-            avg_sex_1 = 0.0
-            avg_sex_2 = 0.0
+            weighted = [0.0] * len(DEMOGRAPHIC_COLS)
+        weighted_by_col = dict(zip(DEMOGRAPHIC_COLS, weighted))
+
+        avg_sex_1 = weighted_by_col.pop('sex_1')
+        avg_sex_2 = weighted_by_col.pop('sex_2')
 
         # Age distribution (weighted percentages)
-        age_distribution = {}
-        for i in range(1, 10):
-            col = f'age_{i}'
-            if col in filtered_df.columns and total_users > 0:
-                age_distribution[col] = float((filtered_df[col] * weights).sum() / total_users)
-            else:
-                age_distribution[col] = 0.0
-
-        if 'age_other' in filtered_df.columns and total_users > 0:
-            age_distribution['age_other'] = float((filtered_df['age_other'] * weights).sum() / total_users)
-        else:
-            age_distribution['age_other'] = 0.0
-
-        # Top 5 locations by total users
-        top_5 = filtered_df.nlargest(5, 'avg_total_users')
-        top_locations = []
-        for _, row in top_5.iterrows():
-            top_locations.append({
-                'lat': float(row['lat']),
-                'lon': float(row[lng_col]),
-                'total_users': float(row['avg_total_users']),
-                'under_10min': float(row.get('avg_users_under_10min', 0)),
-                '10_30min': float(row.get('avg_users_10_30min', 0)),
-                'over_30min': float(row.get('avg_users_over_30min', 0))
-            })
+        age_distribution = weighted_by_col
+
+        # Top 5 locations by total users, matching nlargest(keep='first'): find the k-th
+        # largest value in O(n), then stable-sort every row at or above it so ties keep row order
+        k = min(TOP_LOCATIONS_K, total_records)
+        threshold = weights[np.argpartition(weights, -k)[-k]]
+        candidates = np.flatnonzero(weights >= threshold)
+        top_idx = candidates[np.argsort(-weights[candidates], kind='stable')][:k]
+        # Slice only the top rows out of each column; missing duration columns count as 0
+        top_columns = [
+            filtered_df[col].to_numpy()[top_idx].tolist() if col in filtered_df.columns else [0.0] * k
+            for col in ['lat', lng_col, 'avg_total_users'] + DURATION_COLS
+        ]
+        top_locations = [
+            {
+                'lat': lat,
+                'lon': lon,
+                'total_users': total,
+                'under_10min': under_10min,
+                '10_30min': min_10_30,
+                'over_30min': over_30min
+            }
+            for lat, lon, total, under_10min, min_10_30, over_30min in zip(*top_columns)
+        ]
 
         return {
             'total_records': total_records,
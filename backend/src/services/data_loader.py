@@ -3,6 +3,8 @@ Data Loader Service
 Loads and caches CSV data with coordinate conversion for the heatmap visualization.
 
 Implements eager coordinate conversion on startup and O(1) lookup via dictionary indexing.
+Missing metric and demographic values are filled with 0.0 at load time, so every
+consumer of the cached frame (heatmap, demographics, chat exporter) sees 0.0, not NaN.
 Memory footprint: ~5MB for ~2,881 rows with optimized data types.
 """
 
@@ -92,6 +94,10 @@ class DataCache:
 
         logger.info(f"Loaded {len(self.df)} rows")
 
+        # Replace missing metric/demographic values once so queries need no NaN handling
+        float_cols = [col for col, dtype in dtype_mapping.items() if dtype == 'float32' and col in self.df.columns]
+        self.df[float_cols] = self.df[float_cols].fillna(0.0)
+
         # Convert coordinates (EAGER)
         logger.info("Converting gx/gy to lat/lng...")
         lat_array, lng_array = batch_gxgy_to_latlon(
@@ -4,95 +4,32 @@ Handles communication with local Ollama service for AI-powered chat responses.
 """
 
 import logging
-from typing import Dict, List, Optional
-from ollama import Client
-from ..utils.config import OLLAMA_HOST, OLLAMA_MODEL
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import orjson
+from ..utils.config import OLLAMA_HEALTH_TTL, OLLAMA_HOST, OLLAMA_MODEL
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of rendered system prompts kept per service instance
+PROMPT_CACHE_SIZE = 512
 
-class OllamaService:
-    """
-    Service for interacting with Ollama local AI model.
-
-    Handles health checks, system prompt building, and response generation
-    for chatbot queries about heatmap data.
-    """
-
-    def __init__(self, host: str = OLLAMA_HOST, model: str = OLLAMA_MODEL):
-        """
-        Initialize Ollama service client.
-
-        Args:
-            host: Ollama server URL (default: http://localhost:11434)
-            model: Model name to use (default: qwen2.5:7b)
-        """
-        self.host = host
-        self.model = model
-        self.client = Client(host=host)
-        logger.info(f"OllamaService initialized: {host} with model {model}")
-
-    def check_health(self) -> Dict:
-        """
-        Check if Ollama service is available and model is loaded.
-
-        Returns:
-            Dictionary with status, model_loaded, and error fields
-        """
-        try:
-            # Try to list available models
-            response = self.client.list()
-
-            # Handle both dict and ListResponse object
-            if hasattr(response, 'models'):
-                # New Ollama client (0.6.1+) returns ListResponse object
-                models = response.models
-                model_names = [m.model for m in models]
-            else:
-                # Old Ollama client returns dict
-                models = response.get('models', [])
-                model_names = [m.get('name', m.get('model', '')) for m in models]
-
-            model_loaded = self.model in model_names
-
-            return {
-                'status': 'connected' if model_loaded else 'degraded',
-                'model_loaded': model_loaded,
-                'available_models': model_names,
-                'error': None if model_loaded else f"Model {self.model} not found. Run: ollama pull {self.model}"
-            }
-        except Exception as e:
-            logger.error(f"Ollama health check failed: {e}")
-            return {
-                'status': 'disconnected',
-                'model_loaded': False,
-                'available_models': [],
-                'error': f"Cannot connect to Ollama at {self.host}: {str(e)}"
-            }
-
-    def build_system_prompt(self, data_context: Dict) -> str:
-        """
-        Build system prompt with data context for AI analysis.
-
-        Args:
-            data_context: Dictionary containing filter conditions and data summary
-
-        Returns:
-            Formatted system prompt in Traditional Chinese
-        """
-        import json
-
-        prompt = f"""你是專業的數據分析助理，專門分析台灣地區人流熱力圖數據。你的任務是深入分析提供的數據並給出具體、有洞察力的回答。
+# System prompt header; filter placeholders are filled by OllamaService.build_system_prompt
+SYSTEM_PROMPT_HEADER = """你是專業的數據分析助理，專門分析台灣地區人流熱力圖數據。你的任務是深入分析提供的數據並給出具體、有洞察力的回答。
 
 ## 當前數據上下文
 
 ### 篩選條件
-- 月份: {data_context.get('month', 'N/A')}
-- 時段: {data_context.get('hour', 'N/A')}:00
-- 日期類型: {data_context.get('day_type', 'N/A')}
+- 月份: {month}
+- 時段: {hour}:00
+- 日期類型: {day_type}
 
 ### 後端計算的數據摘要
-{json.dumps(data_context.get('summary', {}), ensure_ascii=False, indent=2)}
+"""
+
+# Static system prompt body following the summary JSON
+SYSTEM_PROMPT_BODY = """
 
 ## 數據摘要欄位說明
 
@@ -210,16 +147,157 @@ class OllamaService:
   - 說明當前只顯示單一條件的數據
   - 建議用戶調整左側控制面板的篩選條件（月份、時段、日期類型）來查看不同情況
 """
+
+
+def _model_names_new(response) -> List[str]:
+    """Extract model names from a ListResponse object (ollama 0.4+)."""
+    return [m.model for m in response.models]
+
+
+def _model_names_old(response) -> List[str]:
+    """Extract model names from a list response dict (older ollama clients)."""
+    return [m.get('name', m.get('model', '')) for m in response.get('models', [])]
+
+
+def _chunk_fields_new(chunk) -> Tuple[str, Optional[int]]:
+    """Extract (content, tokens_used) from a streamed ChatResponse; tokens_used is None until done."""
+    if chunk.done:
+        return chunk.message.content, (chunk.eval_count or 0) + (chunk.prompt_eval_count or 0)
+    return chunk.message.content, None
+
+
+def _chunk_fields_old(chunk) -> Tuple[str, Optional[int]]:
+    """Extract (content, tokens_used) from a streamed chat dict; tokens_used is None until done."""
+    if chunk.get('done'):
+        return chunk['message']['content'], chunk.get('eval_count', 0) + chunk.get('prompt_eval_count', 0)
+    return chunk['message']['content'], None
+
+
+class OllamaService:
+    """
+    Service for interacting with Ollama local AI model.
+
+    Handles health checks, system prompt building, and response generation
+    for chatbot queries about heatmap data.
+    """
+
+    def __init__(self, host: str = OLLAMA_HOST, model: str = OLLAMA_MODEL):
+        """
+        Initialize Ollama service client.
+
+        Args:
+            host: Ollama server URL (default: http://localhost:11434)
+            model: Model name to use (default: qwen2.5:7b)
+        """
+        # Imported lazily so importing this module does not load the ollama client stack
+        import ollama
+
+        self.host = host
+        self.model = model
+        self.client = ollama.AsyncClient(host=host)
+
+        # Detect response shape once: ollama 0.4+ returns typed objects, older clients return dicts.
+        # ListResponse only exists in 0.4+ (older versions export ChatResponse as a TypedDict).
+        if hasattr(ollama, 'ListResponse'):
+            self._extract_model_names = _model_names_new
+            self._extract_chunk = _chunk_fields_new
+        else:
+            self._extract_model_names = _model_names_old
+            self._extract_chunk = _chunk_fields_old
+
+        self._health_cache: Optional[Tuple[float, Dict]] = None
+        self._prompt_cache: "OrderedDict[Tuple, str]" = OrderedDict()
+        logger.info(f"OllamaService initialized: {host} with model {model}")
+
+    async def check_health(self, max_age: float = OLLAMA_HEALTH_TTL) -> Dict:
+        """
+        Check if Ollama service is available and model is loaded.
+
+        Results are reused for max_age seconds to avoid a round-trip per request.
+
+        Args:
+            max_age: Maximum age in seconds of a cached result (0 forces a new check)
+
+        Returns:
+            Dictionary with status, model_loaded, and error fields
+        """
+        if self._health_cache is not None:
+            checked_at, health = self._health_cache
+            if time.monotonic() - checked_at < max_age:
+                return health
+
+        health = await self._fetch_health()
+        self._health_cache = (time.monotonic(), health)
+        return health
+
+    async def _fetch_health(self) -> Dict:
+        """Query Ollama for available models and build the health dictionary."""
+        try:
+            # Try to list available models
+            response = await self.client.list()
+
+            model_names = self._extract_model_names(response)
+            model_loaded = self.model in model_names
+
+            return {
+                'status': 'connected' if model_loaded else 'degraded',
+                'model_loaded': model_loaded,
+                'available_models': model_names,
+                'error': None if model_loaded else f"Model {self.model} not found. Run: ollama pull {self.model}"
+            }
+        except Exception as e:
+            logger.error(f"Ollama health check failed: {e}")
+            return {
+                'status': 'disconnected',
+                'model_loaded': False,
+                'available_models': [],
+                'error': f"Cannot connect to Ollama at {self.host}: {str(e)}"
+            }
+
+    def build_system_prompt(self, data_context: Dict) -> str:
+        """
+        Build system prompt with data context for AI analysis.
+
+        Rendered prompts are cached by (month, hour, day_type).
+
+        Args:
+            data_context: Dictionary containing filter conditions and data summary
+
+        Returns:
+            Formatted system prompt in Traditional Chinese
+        """
+        key = (
+            data_context.get('month', 'N/A'),
+            data_context.get('hour', 'N/A'),
+            data_context.get('day_type', 'N/A')
+        )
+
+        # Summary is deterministic per filter key, so the rendered prompt can be reused
+        prompt = self._prompt_cache.get(key)
+        if prompt is not None:
+            self._prompt_cache.move_to_end(key)
+            return prompt
+
+        summary_json = orjson.dumps(
+            data_context.get('summary', {}),
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode('utf-8')
+        header = SYSTEM_PROMPT_HEADER.format(month=key[0], hour=key[1], day_type=key[2])
+        prompt = f"{header}{summary_json}{SYSTEM_PROMPT_BODY}"
+
+        self._prompt_cache[key] = prompt
+        if len(self._prompt_cache) > PROMPT_CACHE_SIZE:
+            self._prompt_cache.popitem(last=False)
         return prompt
 
-    def generate_response(
+    def _build_messages(
         self,
         user_message: str,
         data_context: Dict,
         history: Optional[List[Dict]] = None
-    ) -> Dict:
+    ) -> List[Dict]:
         """
-        Generate AI response based on user message and data context.
+        Build the chat message list sent to Ollama.
 
         Args:
             user_message: User's question in Traditional Chinese
@@ -227,51 +305,70 @@ class OllamaService:
             history: Recent conversation history (list of message dicts)
 
         Returns:
-            Dictionary with response text, timestamp, model name, and metadata
+            System prompt, trimmed history, and user message
+        """
+        # Build system prompt with data context
+        system_prompt = self.build_system_prompt(data_context)
 
-        Raises:
-            Exception: If Ollama inference fails
+        # Prepare messages for chat
+        messages = [
+            {"role": "system", "content": system_prompt}
+        ]
+
+        # Add conversation history (last 10 message pairs max)
+        if history:
+            messages.extend(history[-20:])  # Last 20 messages = 10 pairs
+
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    async def stream_response(
+        self,
+        user_message: str,
+        data_context: Dict,
+        history: Optional[List[Dict]] = None
+    ) -> AsyncIterator[Dict]:
         """
-        try:
-            # Build system prompt with data context
-            system_prompt = self.build_system_prompt(data_context)
+        Stream AI response chunks as they are generated.
 
-            # Prepare messages for chat
-            messages = [
-                {"role": "system", "content": system_prompt}
-            ]
+        Args:
+            user_message: User's question in Traditional Chinese
+            data_context: Current heatmap data context
+            history: Recent conversation history (list of message dicts)
 
-            # Add conversation history (last 10 message pairs max)
-            if history:
-                messages.extend(history[-20:])  # Last 20 messages = 10 pairs
+        Yields:
+            {'delta': str} for each content chunk, then a final
+            {'done': True, 'model': str, 'tokens_used': int}
 
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
+        Raises:
+            Exception: If Ollama inference fails
+        """
+        try:
+            messages = self._build_messages(user_message, data_context, history)
 
             logger.info(f"Generating response for: {user_message[:50]}...")
 
             # Call Ollama API
-            response = self.client.chat(
+            stream = await self.client.chat(
                 model=self.model,
-                messages=messages
+                messages=messages,
+                stream=True
             )
 
-            # Extract response content (handle both dict and ChatResponse object)
-            if hasattr(response, 'message'):
-                # New Ollama client (0.6.1+) returns ChatResponse object
-                ai_response = response.message.content
-                eval_count = response.eval_count if hasattr(response, 'eval_count') else 0
-                prompt_eval_count = response.prompt_eval_count if hasattr(response, 'prompt_eval_count') else 0
-                tokens_used = eval_count + prompt_eval_count
-            else:
-                # Old Ollama client returns dict
-                ai_response = response['message']['content']
-                tokens_used = response.get('eval_count', 0) + response.get('prompt_eval_count', 0)
+            tokens_used = 0
+            async for chunk in stream:
+                delta, final_tokens = self._extract_chunk(chunk)
+                if final_tokens is not None:
+                    tokens_used = final_tokens
+
+                if delta:
+                    yield {'delta': delta}
 
             logger.info(f"Response generated successfully ({tokens_used} tokens)")
 
-            return {
-                'response': ai_response,
+            yield {
+                'done': True,
                 'model': self.model,
                 'tokens_used': tokens_used
             }
@@ -280,6 +377,42 @@ class OllamaService:
             logger.error(f"Failed to generate response: {e}")
             raise Exception(f"Failed to generate response: {str(e)}")
 
+    async def generate_response(
+        self,
+        user_message: str,
+        data_context: Dict,
+        history: Optional[List[Dict]] = None
+    ) -> Dict:
+        """
+        Generate AI response based on user message and data context.
+
+        Drains stream_response and joins the streamed chunks.
+
+        Args:
+            user_message: User's question in Traditional Chinese
+            data_context: Current heatmap data context
+            history: Recent conversation history (list of message dicts)
+
+        Returns:
+            Dictionary with response text, timestamp, model name, and metadata
+
+        Raises:
+            Exception: If Ollama inference fails
+        """
+        parts = []
+        result = {'model': self.model, 'tokens_used': 0}
+        async for chunk in self.stream_response(user_message, data_context, history):
+            if chunk.get('done'):
+                result = chunk
+            else:
+                parts.append(chunk['delta'])
+
+        return {
+            'response': ''.join(parts),
+            'model': result['model'],
+            'tokens_used': result['tokens_used']
+        }
+
 
 # Global service instance
 _ollama_service: Optional[OllamaService] = None
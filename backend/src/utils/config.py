@@ -75,6 +75,7 @@ CORS_CONFIG = {
 # Ollama Configuration
 OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
 OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'qwen3:14b')
+OLLAMA_HEALTH_TTL = float(os.getenv('OLLAMA_HEALTH_TTL', '5.0'))  # Seconds to reuse a health check result
 
 
 # Metric labels (Chinese)